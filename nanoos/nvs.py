@@ -1,27 +1,165 @@
 '''TODO
-- Implement numpy for faster array calculations.
 - Fine tune check_asset_data_age to represent days, hours, minutes, seconds.
 - Format get_recent_data output to be more intuitive.
 '''
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime,timedelta,timezone
+import json
 import math
-from pyproj import Proj
-import pytz
+import time
+from zoneinfo import ZoneInfo
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ijson
+except ImportError:
+    ijson = None
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+_PACIFIC = ZoneInfo('America/Los_Angeles')  #US/Pacific.
+_UTC = timezone.utc
+_EARTH_RADIUS = 6371e3  #Mean Earth radius in meters.
+_WGS84_A = 6378137.0  #WGS84 semi-major axis in meters.
+_WGS84_E2 = 6.69437999014e-3  #WGS84 first eccentricity squared.
+_JIT_MIN_ASSETS = 32  #Below this the NumPy path is already fast enough.
+_AGE_TTL = 30  #Seconds to reuse an asset's last data timestamp.
+_DEG2RAD = math.pi/180.0
+_RAD2DEG = 180.0/math.pi
+_sin = math.sin
+_cos = math.cos
+_asin = math.asin
+_sqrt = math.sqrt
+_atan2 = math.atan2
+
+_METHODS = ('haversine','euclidian','manhattan')
+
+def _check_method(method):
+    '''Raise a ValueError if method is not a supported distance method.'''
+    if method not in _METHODS:
+        raise ValueError("Unknown distance method: {}. Options: {}".format(
+            method,', '.join(_METHODS)))
+
+def _loads(content):
+    '''Decode a JSON response body, using orjson when it is installed.
+    orjson rejects NaN/Infinity and integers wider than 64 bits, which the 
+    stdlib json accepts, so those bodies fall back to json.loads.'''
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(content)
+
+def _haversine(ship_lat,ship_lon,asset_lat,asset_lon,R=_EARTH_RADIUS):
+    '''Great Circle distance in meters between two points in decimal 
+    degrees, without any dispatch or instance state.'''
+    phi_ship = ship_lat * _DEG2RAD
+    phi_asset = asset_lat * _DEG2RAD
+    s_phi = _sin((phi_asset - phi_ship)/2)
+    s_lambda = _sin((asset_lon - ship_lon) * _DEG2RAD/2)
+    a = (s_phi*s_phi + _cos(phi_ship) * _cos(phi_asset) 
+         * s_lambda*s_lambda)
+    return R * 2 * _asin(_sqrt(a))
+
+def _load_assets(body,online):
+    '''Parse a buffered meta response.
+    @param body -- the response body as bytes.
+    @param online -- drop offline assets if True.
+    @return -- the response success flag and a list of asset dicts.
+    '''
+    content = _loads(body)
+    success = content['success']
+    if success is not True:
+        return success,[]
+    assets = content['result']
+    if online is True:
+        assets = [asset for asset in assets
+                  if "offline" not in asset['deploy_status']]
+    return success,assets
+
+def _stream_assets(raw,online):
+    '''Parse a meta response incrementally with ijson, dropping offline
+    assets as soon as each one is complete.
+    @param raw -- a file-like object with the response body.
+    @param online -- drop offline assets if True.
+    @return -- the response success flag and a list of asset dicts.
+    '''
+    success = None
+    assets = []
+    builder = None
+    for prefix,event,value in ijson.parse(raw,use_float=True):
+        if builder is not None:
+            builder.event(event,value)
+            if prefix == 'result.item' and event == 'end_map':
+                asset = builder.value
+                builder = None
+                if (online is not True 
+                        or "offline" not in asset['deploy_status']):
+                    assets.append(asset)
+        elif prefix == 'result.item' and event == 'start_map':
+            builder = ijson.ObjectBuilder()
+            builder.event(event,value)
+        elif prefix == 'success':
+            success = value
+    if success is not True:
+        return success,[]
+    return success,assets
+
+if HAVE_NUMBA:
+    @njit(cache=True,fastmath=True)
+    def _haversine_mask_kernel(phi_ship,lambda_ship,lats,lons,threshold):
+        '''Compiled per-asset haversine test over contiguous float64 arrays.
+        Positions are in radians and threshold is sin^2(d/2R).'''
+        cos_phi_ship = math.cos(phi_ship)
+        mask = np.empty(lats.shape[0],dtype=np.bool_)
+        for i in range(lats.shape[0]):
+            s_phi = math.sin((lats[i] - phi_ship)/2)
+            s_lambda = math.sin((lons[i] - lambda_ship)/2)
+            a = (s_phi*s_phi + cos_phi_ship * math.cos(lats[i]) 
+                 * s_lambda*s_lambda)
+            mask[i] = a <= threshold
+        return mask
 
 class NVS():
+    haversine = staticmethod(_haversine)
+
     def __init__(self):
         self.base = 'http://nvs.nanoos.org/services/get_asset_info.php'
         self.payload = {}
         self.ISO8601 = '%Y-%m-%dT%H:%M:%SZ'
+        self._ship_key = None
+        self._age_cache = {}  #siso_id -> (expiry, asset_time)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4,pool_maxsize=16)
+        self.session.mount('http://',adapter)
+        self.session.mount('https://',adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+    def close(self):
+        '''Close the HTTP session and release its pooled connections.'''
+        self.session.close()
     
     def status(self):
         '''Ping on NVS services.
         @return -- If the response code is OK (200), return True. 
             Otherwise, return False.
         '''
-        response = requests.get(self.base)
+        response = self.session.get(self.base)
         if response.status_code == requests.codes.ok:
             return True
         else:
@@ -33,55 +171,69 @@ class NVS():
         @return -- a list of asset metadata represented in dicts      
         '''
         self.payload['opt'] = 'meta'
-        content = requests.get(self.base,params=self.payload).json()
-        if content['success'] is True:
-            assets = content['result']
-            if online is True:
-                for asset in assets:
-                    if "offline" in asset['deploy_status']:
-                        assets.remove(asset)
+        if ijson is not None:
+            with self.session.get(self.base,params=self.payload,
+                                  stream=True) as response:
+                response.raw.decode_content = True
+                success,assets = _stream_assets(response.raw,online)
+        else:
+            response = self.session.get(self.base,params=self.payload)
+            success,assets = _load_assets(response.content,online)
+        if success is True:
             return assets
+
+    def _get_asset_arrays(self,assets):
+        '''Pick out the assets that have a position and return their
+        coordinates as contiguous radian arrays for the distance masks.
+        @param assets -- a list of asset metadata dicts.
+        @return -- the located assets, and latitude and longitude arrays
+            that are parallel to them.
+        '''
+        located = [a for a in assets
+                   if a.get('lat') is not None and a.get('lon') is not None]
+        lats = np.fromiter((a['lat'] for a in located),dtype=np.float64,
+                           count=len(located))
+        lons = np.fromiter((a['lon'] for a in located),dtype=np.float64,
+                           count=len(located))
+        return located,np.radians(lats,out=lats),np.radians(lons,out=lons)
     
-    def _set_projection(self):
-        '''Set the projection for UTM conversion.'''
-        if self.ship_lon >= -126:
-            zone = 10
-        elif -129 < self.ship_lon < -126:
-            zone = 9
-        elif self.ship_lon <= -129:
-            zone = 8
-        self.projection = Proj(proj='utm',zone=zone,ellps='WGS84')
-     
-    
-    def _get_haversine_distance(self):
-        '''Compute the Great Circle distance between the ship and an asset.'''
-        R = 6371e3
-        phi_ship = self.ship_lat * math.pi/180
-        phi_asset = self.asset_lat * math.pi/180
-        delta_phi = (self.asset_lat - self.ship_lat) * math.pi/180
-        delta_lambda = (self.asset_lon - self.ship_lon) * math.pi/180
-        a = (math.sin(delta_phi/2) * math.sin(delta_phi/2) + math.cos(phi_ship) 
-        * math.cos(phi_asset) * math.sin(delta_lambda/2) 
-        * math.sin(delta_lambda/2))
-        c = 2 * math.atan2(math.sqrt(a),math.sqrt(1-a))
-        self.haversine = R *c
-        
-    def _get_manhattan_distance(self):
+    def _set_ship(self,ship_lat,ship_lon):
+        '''Set the ship position and cache the trig terms that only depend
+        on it. Nothing is recomputed if the position has not changed.'''
+        self.ship_lat = ship_lat
+        self.ship_lon = ship_lon
+        if (ship_lat,ship_lon) != self._ship_key:
+            self._phi_ship = math.radians(ship_lat)
+            self._sin_phi_ship = math.sin(self._phi_ship)
+            self._cos_phi_ship = math.cos(self._phi_ship)
+            self._lambda_ship = math.radians(ship_lon)
+            self._ship_key = (ship_lat,ship_lon)
+
+    def _get_planar_deltas(self,asset_lat,asset_lon):
+        '''Compute the east (x) and north (y) deltas between the ship and an 
+            asset on a local plane, scaled by the WGS84 radii of curvature 
+            at the mean latitude. Within 10 km this stays within a few 
+            millimeters of the WGS84 geodesic distance.'''
+        phi_asset = math.radians(asset_lat)
+        phi = (self._phi_ship + phi_asset)/2
+        w = 1 - _WGS84_E2 * math.sin(phi)**2
+        N = _WGS84_A / math.sqrt(w)  #Prime vertical radius.
+        M = N * (1 - _WGS84_E2) / w  #Meridional radius.
+        dx = N * math.cos(phi) * (math.radians(asset_lon) - self._lambda_ship)
+        dy = M * (phi_asset - self._phi_ship)
+        return dx,dy
+
+    def _get_manhattan_distance(self,asset_lat,asset_lon):
         '''Compute the manhattan distance between the ship and an asset.
             This is the "taxicab" distance or sum of the x and y deltas
-            between the ship and asset using UTM.'''
-        self._set_projection()         
-        ship_x,ship_y = self.projection(self.ship_lon,self.ship_lat)        
-        asset_x,asset_y = self.projection(self.asset_lon,self.asset_lat)
-        self.manhattan_x = asset_x - ship_x
-        self.manhattan_y = asset_y - ship_y
-        self.manhattan = abs(self.manhattan_x) + abs(self.manhattan_y)
+            between the ship and asset.'''
+        dx,dy = self._get_planar_deltas(asset_lat,asset_lon)
+        return abs(dx) + abs(dy)
 
-    def _get_euclidian_distance(self):
+    def _get_euclidian_distance(self,asset_lat,asset_lon):
         '''Compute the euclidian distance between the ship and an asset.
            This is the straight line distance between two points.'''
-        self._get_manhattan_distance()
-        self.euclidian=math.sqrt((self.manhattan_x)**2 + (self.manhattan_y)**2)
+        return math.hypot(*self._get_planar_deltas(asset_lat,asset_lon))
             
     def get_distance_from_ship(self,ship_lat,ship_lon,asset_lat,asset_lon,
                                method="haversine"):
@@ -94,20 +246,13 @@ class NVS():
                           options: haversine, euclidian, manhattan
         @return -- distance between the ship and asset in meters.
         '''
-        self.ship_lat = ship_lat
-        self.ship_lon = ship_lon       
-        self.asset_lat = asset_lat
-        self.asset_lon = asset_lon
+        _check_method(method)
         if method == "haversine":
-            self._get_haversine_distance()
-            distance = self.haversine
-        elif method == "euclidian":
-            self._get_euclidian_distance()
-            distance =  self.euclidian
-        elif method == "manhattan":
-            self._get_manhattan_distance()
-            distance =  self.manhattan
-        return int(distance)
+            return int(_haversine(ship_lat,ship_lon,asset_lat,asset_lon))
+        self._set_ship(ship_lat,ship_lon)
+        dist_fn = {'euclidian': self._get_euclidian_distance,
+                   'manhattan': self._get_manhattan_distance}[method]
+        return int(dist_fn(asset_lat,asset_lon))
 
     def get_bearing_from_ship(self,ship_lat,ship_lon,asset_lat,asset_lon):  
         '''Get the assets bearing from the ship.
@@ -118,35 +263,119 @@ class NVS():
         @param asset_lon -- longitude of the asset in decimal degees.
         @return -- the bearing in degrees.
         '''
-        delta_lambda = math.radians(asset_lon-ship_lon)
-        phi_ship = math.radians(ship_lat)
-        phi_asset = math.radians(asset_lat)
-        y = math.sin(delta_lambda)* math.cos(phi_asset)
-        x = (math.cos(phi_ship) * math.sin(phi_asset) - math.sin(phi_ship) 
-        * math.cos(phi_asset) * math.cos(delta_lambda))
-        bearing = math.degrees(math.atan2(y,x)) % 360
+        delta_lambda = (asset_lon-ship_lon) * _DEG2RAD
+        phi_ship = ship_lat * _DEG2RAD
+        phi_asset = asset_lat * _DEG2RAD
+        cos_phi_asset = _cos(phi_asset)
+        y = _sin(delta_lambda) * cos_phi_asset
+        x = (_cos(phi_ship) * _sin(phi_asset) - _sin(phi_ship) 
+        * cos_phi_asset * _cos(delta_lambda))
+        bearing = (_atan2(y,x) * _RAD2DEG) % 360
         return int(bearing)  
 
-    def _is_in_range(self,distance,method="haversine"):  
-        '''Determine if an asset is within the watch circle of a ship.
-        @param distance -- the distance in meters.
+    def _get_haversine_mask(self,lats,lons,distance):
+        '''Vectorized Great Circle test for many assets at once.
+        @param lats -- array of asset latitudes in radians.
+        @param lons -- array of asset longitudes in radians.
+        @param distance -- watch circle radius in meters.
+        @return -- a boolean array, True where the asset is within distance.
+        
+        NOTE: The haversine term a is compared against sin^2(d/2R) directly, 
+        which skips the sqrt and arcsin for every asset. Large catalogs use
+        a numba compiled kernel when numba is installed.
+        '''
+        if distance < 0:
+            return np.zeros(lats.shape,dtype=bool)
+        half_angle = distance / (2 * _EARTH_RADIUS)
+        if half_angle >= math.pi/2:
+            return np.ones(lats.shape,dtype=bool)
+        threshold = math.sin(half_angle)**2
+        if HAVE_NUMBA and len(lats) > _JIT_MIN_ASSETS:
+            return _haversine_mask_kernel(self._phi_ship,self._lambda_ship,
+                                          lats,lons,threshold)
+        return self._get_haversine_terms(lats,lons) <= threshold
+
+    def _get_haversine_terms(self,lats,lons):
+        '''Vectorized haversine term a, sin^2 of half the central angle.
+        @param lats -- array of asset latitudes in radians.
+        @param lons -- array of asset longitudes in radians.
+        @return -- an array of the haversine term for each asset.
+        '''
+        s_phi = np.sin((lats - self._phi_ship)/2)
+        s_lambda = np.sin((lons - self._lambda_ship)/2)
+        return (s_phi*s_phi + self._cos_phi_ship * np.cos(lats) 
+                * s_lambda*s_lambda)
+
+    def _get_haversine_distances(self,lats,lons):
+        '''Vectorized Great Circle distances in meters.'''
+        a = self._get_haversine_terms(lats,lons)
+        return 2 * _EARTH_RADIUS * np.arcsin(np.sqrt(a))
+
+    def _get_euclidian_distances(self,lats,lons):
+        '''Vectorized straight line distances in meters.'''
+        return np.hypot(*self._get_planar_delta_arrays(lats,lons))
+
+    def _get_manhattan_distances(self,lats,lons):
+        '''Vectorized taxicab distances in meters.'''
+        dx,dy = self._get_planar_delta_arrays(lats,lons)
+        return np.abs(dx) + np.abs(dy)
+
+    def _get_planar_delta_arrays(self,lats,lons):
+        '''Vectorized local plane x and y deltas for many assets at once.
+        Uses the same WGS84 radii of curvature as _get_planar_deltas.
+        @param lats -- array of asset latitudes in radians.
+        @param lons -- array of asset longitudes in radians.
+        @return -- arrays of the x and y deltas in meters.
+        '''
+        phi = (lats + self._phi_ship)/2
+        w = 1 - _WGS84_E2 * np.sin(phi)**2
+        N = _WGS84_A / np.sqrt(w)
+        M = N * (1 - _WGS84_E2) / w
+        dx = N * np.cos(phi) * (lons - self._lambda_ship)
+        dy = M * (lats - self._phi_ship)
+        return dx,dy
+
+    def _get_euclidian_mask(self,lats,lons,distance):
+        '''Vectorized straight line distance test for many assets at once.
+        @param lats -- array of asset latitudes in radians.
+        @param lons -- array of asset longitudes in radians.
+        @param distance -- watch circle radius in meters.
+        @return -- a boolean array, True where the asset is within distance.
+        '''
+        if distance < 0:
+            return np.zeros(lats.shape,dtype=bool)
+        dx,dy = self._get_planar_delta_arrays(lats,lons)
+        return dx*dx + dy*dy <= distance*distance
+
+    def _get_manhattan_mask(self,lats,lons,distance):
+        '''Vectorized taxicab distance test for many assets at once.
+        @param lats -- array of asset latitudes in radians.
+        @param lons -- array of asset longitudes in radians.
+        @param distance -- watch circle radius in meters.
+        @return -- a boolean array, True where the asset is within distance.
+        '''
+        return self._get_manhattan_distances(lats,lons) <= distance
+
+    def _vectorized_distance_bearing(self,lats,lons,method="haversine"):
+        '''Compute distance and bearing from the ship for many assets at once.
+        @param lats -- array of asset latitudes in radians.
+        @param lons -- array of asset longitudes in radians.
         @param method -- how to calculate the distance. 
                           options: haversine, euclidian, manhattan
-        @return -- True if it is within the watch circle distance, False if not
+        @return -- arrays of distances in meters and bearings in degrees.
         '''
-        if method == "haversine":
-            self._get_haversine_distance()
-            asset_distance = self.haversine
-        elif method == "euclidian":
-            self._get_euclidian_distance()
-            asset_distance = self.euclidian
-        elif method == "manhattan":
-            self._get_manhattan_distance()
-            asset_distance = self.manhattan
-        if asset_distance <= distance:
-            return True
-        else:
-            return False
+        _check_method(method)
+        dist_fn = {'haversine': self._get_haversine_distances,
+                   'euclidian': self._get_euclidian_distances,
+                   'manhattan': self._get_manhattan_distances}[method]
+        d = dist_fn(lats,lons)
+        delta_lambda = lons - self._lambda_ship
+        cos_lats = np.cos(lats)
+        y = np.sin(delta_lambda) * cos_lats
+        x = (self._cos_phi_ship * np.sin(lats) - self._sin_phi_ship 
+             * cos_lats * np.cos(delta_lambda))
+        b = np.degrees(np.arctan2(y,x)) % 360
+        return d,b
         
     def get_nearby_assets_metadata(self,ship_lat,ship_lon,distance=10000,
                                    method="haversine",online=True):
@@ -159,17 +388,17 @@ class NVS():
         @param online -- only get the metadata for active assets if True.
         @return -- an array of dictionaries that contain asset metadata.
         '''
-        self.ship_lat = ship_lat
-        self.ship_lon = ship_lon
+        _check_method(method)
+        mask_fn = {'haversine': self._get_haversine_mask,
+                   'euclidian': self._get_euclidian_mask,
+                   'manhattan': self._get_manhattan_mask}[method]
+        self._set_ship(ship_lat,ship_lon)
         assets = self.get_all_assets_metadata(online=online)
-        nearby = []
-        for asset in assets:
-            self.asset_lat = asset['lat']
-            self.asset_lon = asset['lon']
-            if self._is_in_range(distance,method) is True:
-                nearby.append(asset)
-            else:
-                continue
+        if assets is None:
+            return None
+        assets,lats,lons = self._get_asset_arrays(assets)
+        mask = mask_fn(lats,lons,distance)
+        nearby = [assets[i] for i in np.flatnonzero(mask)]
         if nearby == []:
             return None
         else:
@@ -197,17 +426,25 @@ class NVS():
     
     def get_nearby_distance_bearing(self,ship_lat,ship_lon,distance,
                                     method="haversine",online=True):
-        nearby = self.get_nearby_assets_metadata(ship_lat,ship_lon,distance,
-                                                 method,online)
-        db = []
-        for asset in nearby:
-            asset_lat = asset['lat']
-            asset_lon = asset['lon']        
-            d,b = self.get_asset_distance_bearing(ship_lat,ship_lon,
-                                                  asset,method)
-            info = [asset_lat,asset_lon,d,b]
-            db.append(info)
-        return db
+        '''Get the position, distance and bearing of all assets within a 
+        watch circle.
+        @param ship_lat -- latitude of the ship in decimal degrees.
+        @param ship_lon -- longitude of the ship in decimal degrees
+        @param distance -- watch circle radius in meters.
+        @param method -- how to calculate the distance. 
+                          options: haversine, euclidian, manhattan       
+        @param online -- only check active assets if True.
+        @return -- a list of [lat, lon, distance, bearing] for each asset.
+        '''
+        _check_method(method)
+        self._set_ship(ship_lat,ship_lon)
+        assets = self.get_all_assets_metadata(online=online)
+        if assets is None:
+            return []
+        assets,lats,lons = self._get_asset_arrays(assets)
+        d,b = self._vectorized_distance_bearing(lats,lons,method)
+        return [[assets[i]['lat'],assets[i]['lon'],int(d[i]),int(b[i])]
+                for i in np.flatnonzero(d <= distance)]
 
     def check_asset_data_age(self,asset):
         '''Get the asset data age.
@@ -216,19 +453,28 @@ class NVS():
         
         NOTE: This assumes that assets within NVS all have US/Pacific
         timestamps. The asset and now times are made timezone aware, which
-        allows math to be performed.
+        allows math to be performed. The asset timestamp is reused for
+        _AGE_TTL seconds, but the age is always measured against now.
         '''
-        self.payload['opt'] = 'data_age'
-        self.payload['asset_id'] = asset['siso_id']
-        content = requests.get(self.base,params=self.payload).json()
-        if content['success'] is True:
+        siso_id = asset['siso_id']
+        cached = self._age_cache.get(siso_id)
+        if cached is not None and time.monotonic() < cached[0]:
+            asset_time = cached[1]
+        else:
+            self.payload['opt'] = 'data_age'
+            self.payload['asset_id'] = siso_id
+            response = self.session.get(self.base,params=self.payload)
+            content = _loads(response.content)
+            if content['success'] is not True:
+                return None
             asset = content['result'].pop()     
-            asset_time = datetime.fromtimestamp(asset['time'])  
-            asset_time = asset_time.replace(tzinfo=pytz.timezone('US/Pacific'))
-            now_time = datetime.now(timezone.utc)
-            total = (now_time-asset_time).total_seconds()   
-            age = timedelta(seconds = total)
-            return age
+            asset_time = datetime.fromtimestamp(asset['time'],tz=_PACIFIC)
+            self._age_cache[siso_id] = (time.monotonic() + _AGE_TTL,
+                                        asset_time)
+        now_time = datetime.now(_UTC)
+        total = (now_time-asset_time).total_seconds()   
+        age = timedelta(seconds = total)
+        return age
             
     def get_recent_data(self,asset):
         '''Get the most recent data from the asset.
@@ -236,31 +482,39 @@ class NVS():
             measurements, and var_id's.
         @return -- a list/dict of each measurement by depth. Each element is
             renamed to be the var_id in combination with the depth. 
-            That combo is then connected to a list in the order of 
-            [value, units, time, depth]
+            That combo is then connected to a tuple in the order of 
+            (value, units, time, depth)
             
-            Example: 'H1_Salinity_-0.9 m': [10.9, 'PSU', 1613754000, -0.9]
+            Example: 'H1_Salinity_-0.9 m': (10.9, 'PSU', 1613754000, -0.9)
             
         NOTE: Depth is in meters.    
         ''' 
         self.payload['opt'] = 'recent_values'
         self.payload['asset_id'] = asset['siso_id']
         self.payload['units_mode'] = 'v1'        
+        var_ids = [var['var_id'] for var in asset['measurements']]
+        
+        def _fetch(var_id):
+            params = dict(self.payload,var_id=var_id)
+            response = self.session.get(self.base,params = params)
+            return _loads(response.content)
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            contents = list(executor.map(_fetch,var_ids))
         all_data = []
-        for var in asset['measurements']:
-            self.payload['var_id'] = var['var_id']
-            content = requests.get(self.base,params = self.payload).json()
+        for content in contents:
+            data = {}
             if content['success'] is True:
                 samples = content['result']
-                data = {}
                 for sample in samples:
-                    depth = float(sample['depth'].replace('m',''))
-                    dt = datetime.fromtimestamp(sample['time'])
-                    pacific = dt.replace(tzinfo=pytz.timezone('US/Pacific'))
-                    utc = pacific.astimezone(timezone.utc)
+                    var_id = sample['var_id']
+                    depth_str = sample['depth']
+                    depth = float(depth_str.rstrip(' m'))
+                    utc = datetime.fromtimestamp(sample['time'],
+                                                 tz=_PACIFIC).astimezone(_UTC)
                     time_str = utc.strftime(self.ISO8601)
-                    d = [sample['value'],sample['units'],time_str,depth]
-                    var_name = sample['var_id']+ '_' +sample['depth']
-                    data[var_name] = d
+                    data[f"{var_id}_{depth_str}"] = (sample['value'],
+                                                     sample['units'],
+                                                     time_str,depth)
             all_data.append(data)
         return all_data
\ No newline at end of file
@@ -18,8 +18,14 @@ setuptools.setup(
         "License :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires='>=3.4',
+    python_requires='>=3.9',
     install_requires=[
+        'numpy',
         'requests',
+        'tzdata',
         ],
+    extras_require={
+        #orjson rejects NaN and >64 bit ints; those bodies fall back to json.
+        'speedups': ['ijson>=3.1','numba','orjson'],
+        },
 )
\ No newline at end of file
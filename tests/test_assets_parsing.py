@@ -0,0 +1,70 @@
+"""Offline checks that the streamed (ijson) and buffered parsers of the NVS
+meta response agree, so behavior does not depend on whether the optional
+ijson dependency is installed.
+"""
+
+import io
+
+import pytest
+
+from nanoos.nvs import _load_assets,_stream_assets
+
+ijson = pytest.importorskip("ijson")
+
+ONLINE = (b'{"siso_id": "a", "lat": 44.62, "lon": -124.04, '
+          b'"deploy_status": "online"}')
+OFFLINE = (b'{"siso_id": "b", "lat": 44.7, "lon": -124.1, '
+           b'"deploy_status": "offline"}')
+NESTED = (b'{"siso_id": "c", "lat": 44.5, "lon": -124.2, '
+          b'"deploy_status": "online", "platform": {"type": {"id": 3}}, '
+          b'"measurements": [{"var_id": "H1_Salinity", '
+          b'"meta": {"units": {"v1": "PSU"}}}, {"var_id": "H1_Temp"}]}')
+NO_STATUS = b'{"siso_id": "d", "lat": 44.6, "lon": -124.0}'
+
+BODIES = {
+    'success_first': b'{"success": true, "result": [' + ONLINE + b', '
+                     + OFFLINE + b']}',
+    'success_after_result': b'{"result": [' + OFFLINE + b', ' + ONLINE 
+                            + b'], "success": true}',
+    'success_false': b'{"success": false, "result": "no data"}',
+    'success_false_with_list': b'{"success": false, "result": [' + ONLINE
+                               + b']}',
+    'nested_maps': b'{"success": true, "result": [' + NESTED + b', '
+                   + OFFLINE + b']}',
+    'empty_result': b'{"success": true, "result": []}',
+}
+
+def _both(body,online):
+    return (_stream_assets(io.BytesIO(body),online),
+            _load_assets(body,online))
+
+@pytest.mark.parametrize('online',[True,False])
+@pytest.mark.parametrize('name',sorted(BODIES))
+def test_stream_matches_buffered(name,online):
+    streamed,buffered = _both(BODIES[name],online)
+    assert streamed == buffered
+
+def test_online_filter_drops_offline_assets():
+    success,assets = _stream_assets(io.BytesIO(BODIES['nested_maps']),True)
+    assert success is True
+    assert [a['siso_id'] for a in assets] == ['c']
+    assert assets[0]['measurements'][0]['meta'] == {'units': {'v1': 'PSU'}}
+    assert assets[0]['platform'] == {'type': {'id': 3}}
+
+def test_failure_returns_no_assets():
+    for name in ('success_false','success_false_with_list'):
+        assert _both(BODIES[name],True) == ((False,[]),(False,[]))
+
+def test_coordinates_are_floats():
+    success,assets = _stream_assets(io.BytesIO(BODIES['success_first']),False)
+    assert all(type(a['lat']) is float for a in assets)
+
+def test_missing_deploy_status_only_matters_when_online():
+    body = b'{"success": true, "result": [' + NO_STATUS + b']}'
+    streamed,buffered = _both(body,False)
+    assert streamed == buffered == (True,[{'siso_id': 'd','lat': 44.6,
+                                           'lon': -124.0}])
+    with pytest.raises(KeyError):
+        _stream_assets(io.BytesIO(body),True)
+    with pytest.raises(KeyError):
+        _load_assets(body,True)